@@ -44,6 +44,8 @@ static long to_serial(long i, long a, long j, long b, long natom);
 static PyObject* py_kron_nn33_long(PyObject* self, PyObject* args);
 static PyObject* py_get_compact_spg_proj(PyObject* self, PyObject* args);
 static PyObject* py_kron_nn33_int(PyObject* self, PyObject* args);
+static PyObject* py_get_perm_compression_matrix(PyObject* self,
+                                                PyObject* args);
 struct module_state {
     PyObject* error;
 };
@@ -64,6 +66,8 @@ static PyMethodDef _symfc_methods[] = {
      "Compute kron and transform n3n3 indices to nn33 indices."},
     {"get_compact_spg_proj", py_get_compact_spg_proj, METH_VARARGS,
      "Compute compact space group operation projector matrix."},
+    {"get_perm_compression_matrix", py_get_perm_compression_matrix,
+     METH_VARARGS, "Compute CSC arrays of permutation compression matrix."},
     {NULL, NULL, 0, NULL}};
 
 static int _symfc_traverse(PyObject* m, visitproc visit, void* arg) {
@@ -282,6 +286,54 @@ static PyObject* py_get_compact_spg_proj(PyObject* self, PyObject* args) {
     Py_RETURN_NONE;
 }
 
+static PyObject* py_get_perm_compression_matrix(PyObject* self,
+                                                PyObject* args) {
+    PyArrayObject* py_indptr;
+    PyArrayObject* py_indices;
+    PyArrayObject* py_data;
+    long natom;
+
+    double inv_sqrt2 = sqrt(2) / 2;
+
+    if (!PyArg_ParseTuple(args, "OOOl", &py_indptr, &py_indices, &py_data,
+                          &natom)) {
+        return NULL;
+    }
+
+    long* indptr = (long*)PyArray_DATA(py_indptr);
+    long* indices = (long*)PyArray_DATA(py_indices);
+    double* data = (double*)PyArray_DATA(py_data);
+
+    // Column n corresponds to (ia, jb) with ia <= jb. Its elements are at rows
+    // ijab and jiba, where ijab < jiba.
+    long n = 0;
+    long count = 0;
+    long i_i, i_a, i_j, i_b;
+    indptr[0] = 0;
+    for (long ia = 0; ia < natom * 3; ia++) {
+        i_i = ia / 3;
+        i_a = ia % 3;
+        for (long jb = ia; jb < natom * 3; jb++) {
+            i_j = jb / 3;
+            i_b = jb % 3;
+            indices[count] = to_serial(i_i, i_a, i_j, i_b, natom);
+            if (ia == jb) {
+                data[count] = 1;
+                count++;
+            } else {
+                data[count] = inv_sqrt2;
+                count++;
+                indices[count] = to_serial(i_j, i_b, i_i, i_a, natom);
+                data[count] = inv_sqrt2;
+                count++;
+            }
+            n++;
+            indptr[n] = count;
+        }
+    }
+    Py_RETURN_NONE;
+}
+
 static long to_serial(long i, long a, long j, long b, long natom) {
     return (i * 9 * natom) + (j * 9) + (a * 3) + b;
 }
@@ -25,6 +25,7 @@ setup(
     author="Atsuto Seko",
     author_email="seko@cms.mtl.kyoto-u.ac.jp",
     install_requires=["numpy", "scipy", "phonopy", "spglib"],
+    extras_require={"mkl": ["sparse_dot_mkl"]},
     provides=["symfc"],
     platforms=["all"],
     ext_modules=[extension],
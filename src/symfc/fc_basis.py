@@ -306,7 +306,8 @@ class FCBasisSets:
                 U = proj_perm.dot(U)
                 U = proj_sum.dot(U)
 
-        U, s, _ = np.linalg.svd(U, full_matrices=False)
+        # U is computed above and is finite, therefore the check is skipped.
+        U, s, _ = scipy.linalg.svd(U, full_matrices=False, check_finite=False)
         U = U[:, np.where(np.abs(s) > tol)[0]]
 
         if self._log_level:
@@ -1,12 +1,15 @@
 """Functions to handle matrix indices."""
-import itertools
-
 import numpy as np
 import scipy
 from scipy.sparse import csr_array
 
 import symfc._symfc as symfcc
 
+try:
+    from sparse_dot_mkl import dot_product_mkl
+except ImportError:
+    dot_product_mkl = None
+
 
 def to_serial(i: int, a: int, j: int, b: int, natom: int) -> int:
     """Return NN33-1D index."""
@@ -30,6 +33,20 @@ def convert_basis_sets_matrix_form(basis_sets) -> list[np.ndarray]:
     return b_mat_all
 
 
+def dot_product_sparse(A, B: np.ndarray) -> np.ndarray:
+    """Return product of sparse matrix and dense array, A @ B.
+
+    Multithreaded MKL is used via sparse_dot_mkl when it is installed.
+    Otherwise scipy.sparse is used.
+
+    """
+    if dot_product_mkl is None:
+        return A @ B
+    if not (B.flags.c_contiguous or B.flags.f_contiguous):
+        B = np.ascontiguousarray(B)
+    return dot_product_mkl(A, B)
+
+
 def kron_c(reps, natom) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """Compute kron(r, r) in NN33 order in C.
 
@@ -127,6 +144,29 @@ def get_spg_proj_c(reps, natom) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     return row, col, data
 
 
+def get_perm_compression_matrix_c(
+    natom: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute CSC arrays of compression matrix by permutation in C.
+
+    Returns
+    -------
+    indptr, indices, data : np.ndarray
+        CSC arrays of matrix with shape=(NN33, (N*3)((N*3)+1)/2).
+        Row indices are sorted in each column.
+
+    """
+    n = natom * 3 * (natom * 3 + 1) // 2
+    # (N*3) diagonal elements of N3xN3 matrix have one element in each column,
+    # and other columns have two, which sums up to NN33.
+    size_sq = natom**2 * 9
+    indptr = np.zeros(n + 1, dtype="int_")
+    indices = np.zeros(size_sq, dtype="int_")
+    data = np.zeros(size_sq, dtype="double")
+    symfcc.get_perm_compression_matrix(indptr, indices, data, natom)
+    return indptr, indices, data
+
+
 def get_projector_constraints(
     natom: int, with_permutation: bool = True, with_translation: bool = True
 ) -> csr_array:
@@ -167,20 +207,28 @@ def get_projector_permutations(natom: int) -> csr_array:
     """Return permutation constraint projector."""
     size = 3 * natom
     size_sq = size**2
-    row, col, data = [], [], []
-    for ia, jb in itertools.combinations(range(size), 2):
-        i, a = ia // 3, ia % 3
-        j, b = jb // 3, jb % 3
-        id1 = to_serial(i, a, j, b, natom)
-        id2 = to_serial(j, b, i, a, natom)
-        row += [id1, id2, id1, id2]
-        col += [id1, id2, id2, id1]
-        data += [0.5, 0.5, -0.5, -0.5]
+    ia, jb = np.triu_indices(size, k=1)
+    left, right = _get_serial_parts(natom)
+    id1 = left[ia] + right[jb]
+    id2 = left[jb] + right[ia]
+    row = np.concatenate([id1, id2, id1, id2])
+    col = np.concatenate([id1, id2, id2, id1])
+    data = np.repeat([0.5, 0.5, -0.5, -0.5], len(ia))
     C = csr_array((data, (row, col)), shape=(size_sq, size_sq))
     proj = scipy.sparse.eye(size_sq) - C
     return proj
 
 
+def _get_serial_parts(natom: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return NN33-1D index split into parts of N3 indices.
+
+    to_serial(i, a, j, b, natom) == left[i * 3 + a] + right[j * 3 + b].
+
+    """
+    i, a = np.divmod(np.arange(3 * natom), 3)
+    return i * 9 * natom + a * 3, i * 9 + a
+
+
 def _transform_n3n3_serial(serial_id: int, natom: int) -> tuple[int, int, int, int]:
     """Decode 1D index to (N, 3, N, 3) indices."""
     b = serial_id % 3
@@ -221,14 +269,13 @@ def _get_projector_constraints_sum_rule(
     shape=((3N)**2, 9N)
 
     """
-    for i in range(natom):
-        for alpha, beta in itertools.product(range(3), range(3)):
-            for j in range(natom):
-                row.append(to_serial(i, alpha, j, beta, natom))
-                col.append(n)
-                data.append(1.0)
-            n += 1
-    return n
+    left, right = _get_serial_parts(natom)
+    # Indices in the order of (i, alpha, beta, j).
+    ids = left.reshape(natom, 3)[:, :, None, None] + right.reshape(natom, 3).T
+    row += ids.ravel().tolist()
+    col += np.repeat(np.arange(n, n + 9 * natom), natom).tolist()
+    data += [1.0] * ids.size
+    return n + 9 * natom
 
 
 def _get_projector_constraints_permutations(
@@ -241,13 +288,11 @@ def _get_projector_constraints_permutations(
     shape=((3N)**2, 3N(3N-1))
 
     """
-    for ia, jb in itertools.combinations(range(natom * 3), 2):
-        i, a = ia // 3, ia % 3
-        j, b = jb // 3, jb % 3
-        id1 = to_serial(i, a, j, b, natom)
-        id2 = to_serial(j, b, i, a, natom)
-        row += [id1, id2]
-        col += [n, n]
-        data += [1, -1]
-        n += 1
-    return n
+    ia, jb = np.triu_indices(natom * 3, k=1)
+    left, right = _get_serial_parts(natom)
+    id1 = left[ia] + right[jb]
+    id2 = left[jb] + right[ia]
+    row += np.stack([id1, id2], axis=1).ravel().tolist()
+    col += np.repeat(np.arange(n, n + len(ia)), 2).tolist()
+    data += [1, -1] * len(ia)
+    return n + len(ia)
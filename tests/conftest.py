@@ -7,6 +7,7 @@ import pytest
 from phonopy import Phonopy
 from phonopy.interface.phonopy_yaml import read_cell_yaml
 from phonopy.structure.atoms import PhonopyAtoms
+from scipy.sparse import coo_array
 
 from symfc.fc_basis import FCBasisSets
 from symfc.fc_basis_compact import FCBasisSetsCompact
@@ -53,101 +54,185 @@ def ph_nacl_222() -> Phonopy:
     return ph
 
 
-@pytest.fixture(scope=scope)
-def bs_nacl_222() -> np.ndarray:
-    """Return basis sets of NaCl222."""
-    ph = phonopy.load(cwd / "phonopy_NaCl_222_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def ph_sno2_223() -> Phonopy:
+    """Return phonopy instance of SnO2-223."""
+    ph = phonopy.load(cwd / "phonopy_SnO2_223_rd.yaml.xz", produce_fc=False)
+    return ph
+
+
+@pytest.fixture(scope="session")
+def ph_sno2_222() -> Phonopy:
+    """Return phonopy instance of SnO2-222."""
+    ph = phonopy.load(cwd / "phonopy_SnO2_222_rd.yaml.xz", produce_fc=False)
+    return ph
+
+
+@pytest.fixture(scope="session")
+def ph_sio2_222() -> Phonopy:
+    """Return phonopy instance of SiO2-222."""
+    ph = phonopy.load(cwd / "phonopy_SiO2_222_rd.yaml.xz", produce_fc=False)
+    return ph
+
+
+@pytest.fixture(scope="session")
+def ph_sio2_221() -> Phonopy:
+    """Return phonopy instance of SiO2-221."""
+    ph = phonopy.load(cwd / "phonopy_SiO2_221_rd.yaml.xz", produce_fc=False)
+    return ph
+
+
+@pytest.fixture(scope="session")
+def ph_gan_442() -> Phonopy:
+    """Return phonopy instance of GaN-442."""
+    ph = phonopy.load(cwd / "phonopy_GaN_442_rd.yaml.xz", produce_fc=False)
+    return ph
+
+
+@pytest.fixture(scope="session")
+def ph_gan_222() -> Phonopy:
+    """Return phonopy instance of GaN-222."""
+    ph = phonopy.load(cwd / "phonopy_GaN_222_rd.yaml.xz", produce_fc=False)
+    return ph
+
+
+@pytest.fixture(scope="session")
+def reps_nacl_222(ph_nacl_222: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of NaCl222."""
+    ph = ph_nacl_222
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1)
-    return sbs.basis_sets
+    return sym_op_reps.representations
 
 
-@pytest.fixture(scope=scope)
-def bs_sno2_223() -> np.ndarray:
-    """Return basis sets of SnO2-223."""
-    ph = phonopy.load(cwd / "phonopy_SnO2_223_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def reps_sno2_223(ph_sno2_223: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of SnO2-223."""
+    ph = ph_sno2_223
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1)
-    return sbs.basis_sets
+    return sym_op_reps.representations
 
 
-@pytest.fixture(scope=scope)
-def bs_sno2_222() -> np.ndarray:
-    """Return basis sets of SnO2-222."""
-    ph = phonopy.load(cwd / "phonopy_SnO2_222_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def reps_sno2_222(ph_sno2_222: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of SnO2-222."""
+    ph = ph_sno2_222
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1)
-    return sbs.basis_sets
+    return sym_op_reps.representations
 
 
-@pytest.fixture(scope=scope)
-def bs_sio2_222() -> np.ndarray:
-    """Return basis sets of SiO2-222."""
-    ph = phonopy.load(cwd / "phonopy_SiO2_222_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def reps_sio2_222(ph_sio2_222: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of SiO2-222."""
+    ph = ph_sio2_222
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1, lang="C")
-    return sbs.basis_sets
+    return sym_op_reps.representations
 
 
-@pytest.fixture(scope=scope)
-def bs_sio2_221() -> np.ndarray:
-    """Return basis sets of SiO2-221."""
-    ph = phonopy.load(cwd / "phonopy_SiO2_221_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def reps_sio2_221(ph_sio2_221: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of SiO2-221."""
+    ph = ph_sio2_221
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1, lang="C")
-    return sbs.basis_sets
+    return sym_op_reps.representations
 
 
-@pytest.fixture(scope=scope)
-def bs_gan_442() -> np.ndarray:
-    """Return basis sets of GaN-442."""
-    ph = phonopy.load(cwd / "phonopy_GaN_442_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def reps_gan_442(ph_gan_442: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of GaN-442."""
+    ph = ph_gan_442
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1, lang="C")
-    return sbs.basis_sets
+    return sym_op_reps.representations
 
 
-@pytest.fixture(scope=scope)
-def bs_gan_222() -> np.ndarray:
-    """Return basis sets of GaN-222."""
-    ph = phonopy.load(cwd / "phonopy_GaN_222_rd.yaml.xz", produce_fc=False)
+@pytest.fixture(scope="session")
+def reps_gan_222(ph_gan_222: Phonopy) -> list[coo_array]:
+    """Return representations of space group operations of GaN-222."""
+    ph = ph_gan_222
     sym_op_reps = SpgReps(
         ph.supercell.cell.T,
         ph.supercell.scaled_positions.T,
         ph.supercell.numbers,
         log_level=1,
     )
-    sbs = FCBasisSets(sym_op_reps.representations, log_level=1, lang="C")
+    return sym_op_reps.representations
+
+
+@pytest.fixture(scope=scope)
+def bs_nacl_222(reps_nacl_222: list[coo_array]) -> np.ndarray:
+    """Return basis sets of NaCl222."""
+    sbs = FCBasisSets(reps_nacl_222, log_level=1)
+    return sbs.basis_sets
+
+
+@pytest.fixture(scope=scope)
+def bs_sno2_223(reps_sno2_223: list[coo_array]) -> np.ndarray:
+    """Return basis sets of SnO2-223."""
+    sbs = FCBasisSets(reps_sno2_223, log_level=1)
+    return sbs.basis_sets
+
+
+@pytest.fixture(scope=scope)
+def bs_sno2_222(reps_sno2_222: list[coo_array]) -> np.ndarray:
+    """Return basis sets of SnO2-222."""
+    sbs = FCBasisSets(reps_sno2_222, log_level=1)
+    return sbs.basis_sets
+
+
+@pytest.fixture(scope=scope)
+def bs_sio2_222(reps_sio2_222: list[coo_array]) -> np.ndarray:
+    """Return basis sets of SiO2-222."""
+    sbs = FCBasisSets(reps_sio2_222, log_level=1, lang="C")
+    return sbs.basis_sets
+
+
+@pytest.fixture(scope=scope)
+def bs_sio2_221(reps_sio2_221: list[coo_array]) -> np.ndarray:
+    """Return basis sets of SiO2-221."""
+    sbs = FCBasisSets(reps_sio2_221, log_level=1, lang="C")
+    return sbs.basis_sets
+
+
+@pytest.fixture(scope=scope)
+def bs_gan_442(reps_gan_442: list[coo_array]) -> np.ndarray:
+    """Return basis sets of GaN-442."""
+    sbs = FCBasisSets(reps_gan_442, log_level=1, lang="C")
+    return sbs.basis_sets
+
+
+@pytest.fixture(scope=scope)
+def bs_gan_222(reps_gan_222: list[coo_array]) -> np.ndarray:
+    """Return basis sets of GaN-222."""
+    sbs = FCBasisSets(reps_gan_222, log_level=1, lang="C")
     return sbs.basis_sets
 
 
@@ -155,98 +240,49 @@ def bs_gan_222() -> np.ndarray:
 # Compact form
 #
 @pytest.fixture(scope=scope)
-def bs_nacl_222_compact() -> np.ndarray:
+def bs_nacl_222_compact(reps_nacl_222: list[coo_array]) -> np.ndarray:
     """Return basis sets of NaCl222."""
-    ph = phonopy.load(cwd / "phonopy_NaCl_222_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_nacl_222, log_level=1)
     return sbs.basis_sets
 
 
 @pytest.fixture(scope=scope)
-def bs_sno2_223_compact() -> np.ndarray:
+def bs_sno2_223_compact(reps_sno2_223: list[coo_array]) -> np.ndarray:
     """Return basis sets of SnO2-223."""
-    ph = phonopy.load(cwd / "phonopy_SnO2_223_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_sno2_223, log_level=1)
     return sbs.basis_sets
 
 
 @pytest.fixture(scope=scope)
-def bs_sno2_222_compact() -> np.ndarray:
+def bs_sno2_222_compact(reps_sno2_222: list[coo_array]) -> np.ndarray:
     """Return basis sets of SnO2-222."""
-    ph = phonopy.load(cwd / "phonopy_SnO2_222_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_sno2_222, log_level=1)
     return sbs.basis_sets
 
 
 @pytest.fixture(scope=scope)
-def bs_sio2_222_compact() -> np.ndarray:
+def bs_sio2_222_compact(reps_sio2_222: list[coo_array]) -> np.ndarray:
     """Return basis sets of SiO2-222."""
-    ph = phonopy.load(cwd / "phonopy_SiO2_222_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_sio2_222, log_level=1)
     return sbs.basis_sets
 
 
 @pytest.fixture(scope=scope)
-def bs_sio2_221_compact() -> np.ndarray:
+def bs_sio2_221_compact(reps_sio2_221: list[coo_array]) -> np.ndarray:
     """Return basis sets of SiO2-221."""
-    ph = phonopy.load(cwd / "phonopy_SiO2_221_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_sio2_221, log_level=1)
     return sbs.basis_sets
 
 
 @pytest.fixture(scope=scope)
-def bs_gan_442_compact() -> np.ndarray:
+def bs_gan_442_compact(reps_gan_442: list[coo_array]) -> np.ndarray:
     """Return basis sets of GaN-442."""
-    ph = phonopy.load(cwd / "phonopy_GaN_442_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_gan_442, log_level=1)
     return sbs.basis_sets
 
 
 @pytest.fixture(scope=scope)
-def bs_gan_222_compact() -> np.ndarray:
+def bs_gan_222_compact(reps_gan_222: list[coo_array]) -> np.ndarray:
     """Return basis sets of GaN-222."""
-    ph = phonopy.load(cwd / "phonopy_GaN_222_rd.yaml.xz", produce_fc=False)
-    sym_op_reps = SpgReps(
-        ph.supercell.cell.T,
-        ph.supercell.scaled_positions.T,
-        ph.supercell.numbers,
-        log_level=1,
-    )
-    sbs = FCBasisSetsCompact(sym_op_reps.representations, log_level=1)
+    sbs = FCBasisSetsCompact(reps_gan_222, log_level=1)
     return sbs.basis_sets
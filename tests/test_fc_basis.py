@@ -4,6 +4,7 @@ from pathlib import Path
 import numpy as np
 import phonopy
 import pytest
+from phonopy import Phonopy
 
 from symfc.fc_basis import FCBasisSets
 from symfc.spg_reps import SpgReps
@@ -43,7 +44,7 @@ def test_fc_basis_sets(lang, use_exact_projection_matrix):
     assert np.linalg.norm(basis[0]) == pytest.approx(1.0)
 
 
-def test_fc_NaCl_222(bs_nacl_222: np.ndarray):
+def test_fc_NaCl_222(ph_nacl_222: Phonopy, bs_nacl_222: np.ndarray):
     """Test force constants by NaCl 64 atoms supercell and compared with ALM.
 
     Also test force constants by NaCl 64 atoms supercell.
@@ -52,7 +53,7 @@ def test_fc_NaCl_222(bs_nacl_222: np.ndarray):
 
     """
     basis_sets = bs_nacl_222
-    ph = phonopy.load(cwd / "phonopy_NaCl_222_rd.yaml.xz", produce_fc=False)
+    ph = ph_nacl_222
     f = ph.dataset["forces"]
     d = ph.dataset["displacements"]
 
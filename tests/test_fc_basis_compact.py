@@ -4,8 +4,18 @@ from pathlib import Path
 import numpy as np
 import phonopy
 import pytest
-
-from symfc.fc_basis_compact import FCBasisSetsCompact
+from phonopy import Phonopy
+from scipy.sparse import csc_array
+
+from symfc.fc_basis import FCBasisSets
+from symfc.fc_basis_compact import (
+    FCBasisSetsCompact,
+    _get_compact_spg_proj_rank,
+    _get_csc_from_triplets,
+    _get_permutation_compression_matrix,
+    _get_projector_range,
+)
+from symfc.matrix_funcs import get_spg_proj_c
 from symfc.spg_reps import SpgReps
 
 cwd = Path(__file__).parent
@@ -33,11 +43,109 @@ def test_fc_basis_sets_compact():
         log_level=1,
     )
     basis = sbs.basis_sets_matrix_form
-    np.testing.assert_allclose(basis[0], basis_ref, atol=1e-6)
+    # Sign of basis vector is arbitrary.
+    sign = np.sign(basis[0][0, 0] * basis_ref[0][0])
+    np.testing.assert_allclose(basis[0] * sign, basis_ref, atol=1e-6)
     assert np.linalg.norm(basis[0]) == pytest.approx(1.0)
 
 
-def test_fc_NaCl_222(bs_nacl_222_compact: np.ndarray):
+def test_fc_basis_sets_compact_P1():
+    """Test basis sets of low symmetry cell compared with FCBasisSets.
+
+    The cell is 2x1x1 supercell of P1 cell with two atoms. Rank of compact space
+    group projector is 42 of 78, which is computed by range of the projector.
+
+    """
+    lattice = np.array([[8, 0, 0], [0.5, 5, 0], [0.3, 0.2, 6]]).T
+    positions = np.array(
+        [[0, 0, 0], [0.155, 0.27, 0.45], [0.5, 0, 0], [0.655, 0.27, 0.45]]
+    ).T
+    types = [0, 1, 0, 1]
+
+    sym_op_reps = SpgReps(lattice, positions, types)
+    rep = sym_op_reps.representations
+    assert _get_compact_spg_proj_rank(rep) == 42
+
+    basis = FCBasisSetsCompact(rep).basis_sets
+    basis_ref = FCBasisSets(rep).basis_sets
+    assert basis.shape == basis_ref.shape
+    B = basis.reshape(basis.shape[0], -1)
+    B_ref = basis_ref.reshape(basis_ref.shape[0], -1)
+    np.testing.assert_allclose(B @ B.T, np.eye(len(B)), atol=1e-8)
+    np.testing.assert_allclose(B.T @ B, B_ref.T @ B_ref, atol=1e-8)
+
+
+@pytest.mark.parametrize("natom", [1, 2, 5])
+def test_get_permutation_compression_matrix(natom: int):
+    """Test compression matrix by permutation symmetry.
+
+    C.T @ C is the identity and every NN33 element is expanded from exactly
+    one compressed element.
+
+    """
+    perm_mat = _get_permutation_compression_matrix(natom)
+    n = natom * 3 * (natom * 3 + 1) // 2
+    assert perm_mat.shape == (natom**2 * 9, n)
+    np.testing.assert_allclose((perm_mat.T @ perm_mat).toarray(), np.eye(n))
+    np.testing.assert_array_equal((perm_mat != 0).sum(axis=1), 1)
+
+
+def test_get_projector_range():
+    """Test orthonormal basis of range of compact space group projector."""
+    lattice = np.array([[2, 0, 0], [0, 2, 0], [0, 0, 2]])
+    positions = np.array([[0, 0, 0], [0.5, 0.5, 0.5]]).T
+    types = [0, 0]
+    natom = len(types)
+    size = natom * 3 * (natom * 3 + 1) // 2
+
+    sym_op_reps = SpgReps(lattice, positions, types)
+    row, col, data = get_spg_proj_c(sym_op_reps.representations, natom)
+    proj = csc_array((data, (row, col)), shape=(size, size), dtype="double")
+    rank = int(round(proj.diagonal().sum()))
+    vecs = _get_projector_range(proj, rank)
+    assert vecs.shape == (size, rank)
+    np.testing.assert_allclose(vecs.T @ vecs, np.eye(rank), atol=1e-10)
+    np.testing.assert_allclose(vecs @ vecs.T, proj.toarray(), atol=1e-10)
+
+    # Not a projection matrix.
+    with pytest.raises(ValueError):
+        _get_projector_range(proj * 0.5, rank)
+
+
+@pytest.mark.parametrize("pure_translation_only", [False, True])
+def test_get_compact_spg_proj_rank(ph_gan_222: Phonopy, pure_translation_only: bool):
+    """Test rank of compact space group projector by its trace."""
+    ph = ph_gan_222
+    natom = len(ph.supercell)
+    size = natom * 3 * (natom * 3 + 1) // 2
+    sym_op_reps = SpgReps(
+        ph.supercell.cell.T,
+        ph.supercell.scaled_positions.T,
+        ph.supercell.numbers,
+        pure_translation_only=pure_translation_only,
+    )
+    reps = sym_op_reps.representations
+    row, col, data = get_spg_proj_c(reps, natom)
+    proj = _get_csc_from_triplets(row, col, data, size)
+    rank = _get_compact_spg_proj_rank(reps)
+    assert rank == pytest.approx(proj.diagonal().sum())
+
+
+def test_get_csc_from_triplets():
+    """Test conversion of triplets with duplicates by chunks."""
+    size = 7
+    rng = np.random.default_rng(0)
+    row = rng.integers(size, size=100)
+    col = rng.integers(size, size=100)
+    data = rng.random(100)
+    mat_ref = csc_array((data, (row, col)), shape=(size, size)).toarray()
+    for chunk_size in (1, 9, 100, 1000):
+        mat = _get_csc_from_triplets(row, col, data, size, chunk_size=chunk_size)
+        assert mat.has_canonical_format
+        np.testing.assert_allclose(mat.toarray(), mat_ref)
+
+
+def test_fc_NaCl_222(ph_nacl_222: Phonopy, bs_nacl_222_compact: np.ndarray):
     """Test force constants by NaCl 64 atoms supercell and compared with ALM.
 
     Also test force constants by NaCl 64 atoms supercell.
@@ -47,7 +155,7 @@ def test_fc_NaCl_222(bs_nacl_222_compact: np.ndarray):
 
     """
     basis_sets = bs_nacl_222_compact
-    ph = phonopy.load(cwd / "phonopy_NaCl_222_rd.yaml.xz", produce_fc=False)
+    ph = ph_nacl_222
     f = ph.dataset["forces"]
     d = ph.dataset["displacements"]
 
@@ -2,10 +2,11 @@
 
 import numpy as np
 import pytest
+import scipy
 from phonopy import Phonopy
 from scipy.sparse import csr_array
 
-from symfc.matrix_funcs import kron_c
+from symfc.matrix_funcs import dot_product_sparse, kron_c
 from symfc.spg_reps import SpgReps
 
 
@@ -31,3 +32,17 @@ def test_kron_c_NaCl_222(
     proj_mat = csr_array((data, (row, col)), shape=(size_sq, size_sq), dtype="double")
     rank = np.rint(proj_mat.diagonal().sum()).astype(int)
     assert rank == rank_result
+
+
+@pytest.mark.parametrize("fmt", ["csr", "csc"])
+def test_dot_product_sparse(fmt: str):
+    """Test product of sparse matrix and (non-contiguous) dense array by MKL.
+
+    This test is skipped when sparse_dot_mkl is not installed.
+
+    """
+    pytest.importorskip("sparse_dot_mkl")
+    A = scipy.sparse.random(30, 20, density=0.2, format=fmt, random_state=0)
+    B = np.random.default_rng(0).random((20, 10))
+    for b in (B, B[:, 2:7], B[:, 3]):
+        np.testing.assert_allclose(dot_product_sparse(A, b), A @ b)